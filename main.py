@@ -1,12 +1,29 @@
+import argparse
+from datetime import datetime
+
 from src.extract_flight_stats import extract_airports, extract_transtats, run_amadeus_extraction
 from src.extract_reports import web_scrap_reports
-from src.extract_stock_data import run_stock_extraction
+from src.extract_stock_data import run_stock_extraction, extract_price_history, BENCHMARK_SYMBOL
 from src.transform import transform_reports, transform_stocks, transform_airports, transform_transtats, transform_flights
-from src.load import load_to_db, verify_data
+from src.event_study import run_event_study
+from src.reference_data import enrich_airports
+from src.load import load_to_db, record_etl_run, verify_data
+from src.http_client import http_client
+from src.profiling import StageProfiler
+from src.stream_quotes import run_quote_stream
+
+
+def main(profile=False):
+    """
+    Run the complete ETL pipeline
 
+    Args:
+        profile (bool): Profile every extract, transform and load call and
+            write the profiles to the `profiles/` folder
+    """
+    profiler = StageProfiler(enabled=profile)
+    run = profiler.call
 
-def main():
-    """Run the complete ETL pipeline"""
     print("🛫 Starting AeroInvest ETL Pipeline...")
     print("=" * 50)
     
@@ -14,45 +31,72 @@ def main():
     print("\n=== EXTRACTION ===")
     print("📥 Extracting data from sources...")
     
-    airports = extract_airports()
-    transtats = extract_transtats()
-    flights = run_amadeus_extraction()
+    airports = run("extract_airports", extract_airports)
+    transtats = run("extract_transtats", extract_transtats)
+    flight_segments, flight_offers = run("run_amadeus_extraction", run_amadeus_extraction)
 
-    reports_df, report_folder = web_scrap_reports()
-    stock_data = run_stock_extraction()
+    reports_df, report_folder = run("web_scrap_reports", web_scrap_reports)
+    stock_data = run("run_stock_extraction", run_stock_extraction)
+    price_history = run("extract_price_history", extract_price_history)
     
     # Step 2: Transform data
     print("\n=== TRANSFORMATION ===")
     print("🔄 Cleaning and transforming data...")
     
-    clean_airports_data = transform_airports(airports)
-    clean_transtats = transform_transtats(transtats)
-    clean_flights = transform_flights(flights)
+    clean_airports_data = run("transform_airports", transform_airports, airports)
+    clean_airports_data = run("enrich_airports", enrich_airports, clean_airports_data)
+    clean_transtats = run("transform_transtats", transform_transtats, transtats)
+    clean_segments, clean_offers = run("transform_flights", transform_flights,
+                                       flight_segments, flight_offers)
 
-    clean_reports_df = transform_reports(reports_df)
-    clean_stock_data = transform_stocks(stock_data)  
+    clean_reports_df = run("transform_reports", transform_reports, reports_df)
+    clean_stock_data = run("transform_stocks", transform_stocks, stock_data)  
+
+    # Abnormal returns of every company around every accident date
+    event_summary, event_returns = run(
+        "run_event_study", run_event_study,
+        clean_reports_df, price_history, market_symbol=BENCHMARK_SYMBOL
+    )
     
     # Step 3: Load data
     print("\n=== LOADING ===")
     print("💾 Loading data to database...")
     
-    load_to_db(clean_airports_data, "airports")
-    load_to_db(clean_transtats, "air_traffic_statistics")
-    load_to_db(clean_flights, "flights")
+    run("load_to_db[airports]", load_to_db, clean_airports_data, "airports")
+    run("load_to_db[air_traffic_statistics]", load_to_db, clean_transtats, "air_traffic_statistics")
+    run("load_to_db[flight_segments]", load_to_db, clean_segments, "flight_segments")
+    run("load_to_db[flight_offer_segments]", load_to_db, clean_offers, "flight_offer_segments")
+
+    run("load_to_db[incident_accident_reports]", load_to_db, clean_reports_df, "incident_accident_reports")
+    run("load_to_db[stocks]", load_to_db, clean_stock_data, "stocks")
+    run("load_to_db[event_study_summary]", load_to_db, event_summary, "event_study_summary")
+    run("load_to_db[event_study_returns]", load_to_db, event_returns, "event_study_returns")
 
-    load_to_db(clean_reports_df, "incident_accident_reports")
-    load_to_db(clean_stock_data, "stocks")
+    # Lets the read API know that its cached results are stale
+    record_etl_run(datetime.utcnow().strftime("%Y%m%dT%H%M%S"))
     
     # Step 4: Verify everything worked
     print("\n=== VERIFICATION ===")
     print("✅ Verifying data was loaded correctly...")
     
-    verify_data()
+    run("verify_data", verify_data)
 
     print(f"All NTSB reports were downloaded to the {report_folder} folder.")
+    http_client.print_stats()
+    profiler.write_summary()
     
     print("\n🎉 ETL Pipeline completed!")
     print("=" * 50)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run the AeroInvest ETL pipeline.")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile each extract/transform/load stage into profiles/")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream real-time quotes into the stock_ticks table instead of running the pipeline")
+    args = parser.parse_args()
+
+    if args.stream:
+        run_quote_stream()
+    else:
+        main(profile=args.profile)
\ No newline at end of file
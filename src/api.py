@@ -0,0 +1,207 @@
+"""
+Read API Module for AeroInvest
+
+Small read-only HTTP service over the tables loaded by the ETL pipeline, so
+that dashboards do not have to query PostgreSQL directly.
+
+- Queries are parameterized and run on a pooled async driver (asyncpg).
+- Serialized responses are kept in an in-process LRU cache with a TTL.
+- Cached entries are keyed on the latest run id of the `etl_runs` table
+  (written by `record_etl_run` in `src/load.py`): when a new ETL run finishes,
+  every cached response becomes stale at once. Between two runs, repeated
+  requests are served from memory.
+
+Run it with:
+    uvicorn src.api:app --port 8000
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+import asyncpg
+from fastapi import FastAPI, Query, Response
+from fastapi.encoders import jsonable_encoder
+
+from src.load import DATABASE_CONFIG
+
+
+class ResponseCache:
+    """
+    LRU cache with a time-to-live, tied to an ETL run id.
+
+    Keys start with the run id they were computed for; entries of any other
+    run are neither stored nor served.
+
+    Parameters:
+    ----------
+    maxsize : int, optional
+        Maximum number of cached responses (default is 512).
+    ttl : float, optional
+        Seconds a response stays valid, even within the same run (default is 300).
+    """
+
+    def __init__(self, maxsize=512, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.run_id = None
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def set_run_id(self, run_id):
+        """Switch to a new ETL run, dropping every response cached for the previous one."""
+        if run_id != self.run_id:
+            self.run_id = run_id
+            self._entries.clear()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key, value):
+        if key[0] != self.run_id:
+            return  # Computed for a previous run
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        return {"run_id": self.run_id, "entries": len(self._entries),
+                "hits": self.hits, "misses": self.misses}
+
+
+cache = ResponseCache()
+
+# How often the latest ETL run id is polled, in seconds
+RUN_ID_POLL_INTERVAL = 5.0
+
+
+async def _latest_run_id(pool):
+    try:
+        return await pool.fetchval("SELECT max(run_id) FROM etl_runs")
+    except asyncpg.UndefinedTableError:
+        # No run recorded yet
+        return None
+
+
+async def _watch_runs(pool):
+    """Invalidate the cache whenever a new ETL run is recorded."""
+    while True:
+        try:
+            cache.set_run_id(await _latest_run_id(pool))
+        except (OSError, asyncpg.PostgresError) as e:
+            print(f"⚠️ Could not check the latest ETL run: {e}")
+        await asyncio.sleep(RUN_ID_POLL_INTERVAL)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.pool = await asyncpg.create_pool(
+        user=DATABASE_CONFIG["username"],
+        password=DATABASE_CONFIG["password"],
+        host=DATABASE_CONFIG["host"],
+        port=DATABASE_CONFIG["port"],
+        database=DATABASE_CONFIG["database"],
+        min_size=1,
+        max_size=10,
+    )
+    cache.set_run_id(await _latest_run_id(app.state.pool))
+    watcher = asyncio.create_task(_watch_runs(app.state.pool))
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        await app.state.pool.close()
+
+
+app = FastAPI(title="AeroInvest Read API", lifespan=lifespan)
+
+
+async def _cached_query(endpoint, sql, *params):
+    """
+    Run a parameterized query, or serve its serialized result from the cache.
+
+    Returns:
+    -------
+    fastapi.Response
+        JSON array of rows, with an `X-Cache: HIT` or `MISS` header.
+    """
+    # The run id is captured before querying: if a new run is recorded while
+    # the query runs, its result belongs to the old run and is not cached
+    key = (cache.run_id, endpoint, params)
+    body = cache.get(key)
+    if body is not None:
+        return Response(body, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    rows = await app.state.pool.fetch(sql, *params)
+    body = json.dumps(jsonable_encoder([dict(row) for row in rows])).encode()
+    cache.put(key, body)
+    return Response(body, media_type="application/json", headers={"X-Cache": "MISS"})
+
+
+@app.get("/stocks/latest")
+async def latest_stocks(symbol: str | None = None):
+    """Latest stock snapshot, for every company or a single symbol."""
+    return await _cached_query(
+        "stocks/latest",
+        "SELECT * FROM stocks WHERE $1::text IS NULL OR symbol = $1 ORDER BY symbol",
+        symbol,
+    )
+
+
+@app.get("/airports/{country}")
+async def airports_by_country(country: str, type: str | None = None,
+                              limit: int = Query(500, ge=1, le=5000)):
+    """Airports of a country (ISO 3166-1 alpha-2 code), optionally of one type."""
+    return await _cached_query(
+        "airports",
+        "SELECT * FROM airports WHERE iso_country = $1 AND ($2::text IS NULL OR type = $2) "
+        "ORDER BY name LIMIT $3",
+        country.upper(), type, limit,
+    )
+
+
+@app.get("/reports/recent")
+async def recent_reports(limit: int = Query(20, ge=1, le=500)):
+    """Most recent NTSB accident and incident reports."""
+    return await _cached_query(
+        "reports/recent",
+        'SELECT * FROM incident_accident_reports '
+        'ORDER BY "Report Date"::date DESC NULLS LAST LIMIT $1',
+        limit,
+    )
+
+
+@app.get("/event-study/{symbol}")
+async def event_study(symbol: str, limit: int = Query(100, ge=1, le=5000)):
+    """Cumulative abnormal returns of a symbol around accident dates, largest first."""
+    return await _cached_query(
+        "event-study",
+        "SELECT * FROM event_study_summary WHERE symbol = $1 "
+        "ORDER BY abs(car) DESC NULLS LAST LIMIT $2",
+        symbol, limit,
+    )
+
+
+@app.get("/health")
+async def health():
+    """Service status and cache counters."""
+    return {"status": "ok", "cache": cache.stats()}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, port=8000)
@@ -0,0 +1,342 @@
+"""
+Event Study Module for AeroInvest
+
+Links safety events (e.g. the `Accident Date` of the NTSB reports) to the
+stock market reaction of aerospace and airline companies.
+
+Every (event, symbol) pair is processed at once: prices and volumes are
+pivoted into aligned `dates x symbols` matrices, each event date is mapped to
+a trading-day index, the estimation-window statistics come from prefix sums
+and the event windows are gathered with NumPy fancy indexing. There are no
+per-event Python loops, so thousands of events against hundreds of tickers
+run in seconds.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+
+def build_price_matrix(df, value_col, date_col="Date", symbol_col="Symbol"):
+    """
+    Pivot a long price table into an aligned `dates x symbols` matrix.
+
+    Parameters:
+    ----------
+    df : pandas.DataFrame
+        Long table with one row per (date, symbol).
+    value_col : str
+        Column holding the values to pivot (e.g. "Close" or "Volume").
+    date_col : str, optional
+        Column holding the trading date (default is "Date").
+    symbol_col : str, optional
+        Column holding the ticker (default is "Symbol").
+
+    Returns:
+    -------
+    tuple (numpy.ndarray, pandas.DatetimeIndex, pandas.Index)
+        The float matrix (missing values are NaN), its sorted dates and its symbols.
+    """
+    dates = pd.to_datetime(df[date_col]).dt.tz_localize(None).dt.normalize()
+    wide = (
+        pd.DataFrame({"date": dates, "symbol": df[symbol_col], "value": df[value_col]})
+        .pivot_table(index="date", columns="symbol", values="value", aggfunc="last")
+        .sort_index()
+    )
+    return wide.to_numpy(dtype=float), wide.index, wide.columns
+
+
+def _gather(matrix, rows, cols=None):
+    """
+    Gather values for a (K, L) array of trading-day indexes.
+
+    `matrix` is either a 1-D series over trading days or a symbol-major
+    `(symbols, dates)` matrix, in which case `cols` gives the symbol of each of
+    the K rows. Indexes falling outside the history (windows running past the
+    first or last trading day) yield NaN instead of raising or wrapping around.
+    """
+    n_days = matrix.shape[-1]
+    valid = (rows >= 0) & (rows < n_days)
+    safe_rows = np.where(valid, rows, 0)
+
+    if cols is None:
+        out = matrix[safe_rows]
+    else:
+        out = matrix[cols[:, None], safe_rows]
+
+    return np.where(valid, out, np.nan)
+
+
+def _forward_fill_index(valid):
+    """
+    For each cell of a boolean symbol-major matrix, the index of the last
+    valid trading day on or before it (0 when there is none yet).
+    """
+    index = np.where(valid, np.arange(valid.shape[1])[None, :], 0)
+    return np.maximum.accumulate(index, axis=1)
+
+
+def _next_valid_index(valid):
+    """
+    For each cell of a boolean symbol-major matrix, the index of the first
+    valid trading day on or after it (the number of days when there is none).
+    """
+    n_days = valid.shape[1]
+    index = np.where(valid, np.arange(n_days)[None, :], n_days)
+    return np.minimum.accumulate(index[:, ::-1], axis=1)[:, ::-1]
+
+
+def _gather_dates(dates, rows):
+    """Same as `_gather` for a DatetimeIndex, with NaT for out-of-range rows."""
+    valid = (rows >= 0) & (rows < len(dates))
+    out = dates.to_numpy()[np.where(valid, rows, 0)]
+    return np.where(valid, out, np.datetime64("NaT"))
+
+
+def _prefix_sums(matrix):
+    """
+    Cumulative sums along the trading days of a symbol-major matrix, with a
+    leading zero column so that the sum over days [a, b] is
+    `prefix[:, b + 1] - prefix[:, a]`. NaN values count as zero.
+    """
+    prefix = np.zeros((matrix.shape[0], matrix.shape[1] + 1))
+    np.cumsum(np.nan_to_num(matrix), axis=1, out=prefix[:, 1:])
+    return prefix
+
+
+def _window_sums(prefixes, cols, anchor, window, n_days):
+    """
+    Sum every prefix-summed matrix in `prefixes` over `anchor + window` for
+    each (symbol, anchor) pair, clipping the window to the available history.
+    Each window costs O(1) whatever its length.
+    """
+    start = np.clip(anchor + window[0], 0, n_days)
+    end = np.clip(anchor + window[1] + 1, 0, n_days)
+    return [prefix[cols, end] - prefix[cols, start] for prefix in prefixes]
+
+
+def _window_offsets(window):
+    start, end = window
+    if start > end:
+        raise ValueError(f"Invalid window {window}: start must be <= end.")
+    return np.arange(start, end + 1)
+
+
+def run_event_study(events, prices, volumes=None, market_symbol=None,
+                    event_window=(-5, 5), estimation_window=(-120, -11),
+                    event_date_col="Accident Date", event_id_col=None,
+                    symbol_col="Symbol", min_estimation_obs=30):
+    """
+    Compute abnormal returns, cumulative abnormal returns and volume shocks
+    around a set of events for a set of symbols.
+
+    Parameters:
+    ----------
+    events : pandas.DataFrame
+        One row per event. Must contain `event_date_col`. If it also contains
+        `symbol_col`, each event is only studied for that symbol; otherwise
+        every event is crossed with every symbol in `prices`.
+    prices : pandas.DataFrame
+        Long table with "Date", "Symbol" and "Close" columns (see
+        `extract_price_history` in `src/extract_stock_data.py`). A "Volume"
+        column is used for volume shocks when `volumes` is not given.
+    volumes : pandas.DataFrame, optional
+        Long table with "Date", "Symbol" and "Volume" columns.
+    market_symbol : str, optional
+        Benchmark ticker (e.g. "^GSPC"). When given and present in `prices`,
+        abnormal returns follow the market model `R - (alpha + beta * Rm)`;
+        otherwise the mean-adjusted model `R - mean(R)` is used.
+    event_window : tuple of int, optional
+        Trading-day offsets (inclusive) around the event (default is (-5, 5)).
+    estimation_window : tuple of int, optional
+        Trading-day offsets (inclusive) used to fit the normal-return model
+        (default is (-120, -11)).
+    event_date_col : str, optional
+        Column of `events` holding the event date (default is "Accident Date").
+    event_id_col : str, optional
+        Column of `events` identifying each event. Defaults to the row position.
+    symbol_col : str, optional
+        Column of `events` holding a ticker (default is "Symbol").
+    min_estimation_obs : int, optional
+        Minimum number of valid returns in the estimation window; pairs with
+        fewer observations get NaN results (default is 30).
+
+    Returns:
+    -------
+    tuple (pandas.DataFrame, pandas.DataFrame)
+        - summary: one row per (event, symbol) with the CAR over the event
+          window, its t-statistic and the peak absolute volume shock.
+        - detail: one row per (event, symbol, offset) with the abnormal
+          return, the cumulative abnormal return and the volume shock.
+    """
+    if events.empty or prices.empty:
+        print("⚠️ Event study needs both events and prices. Skipping.")
+        return pd.DataFrame(), pd.DataFrame()
+
+    # Aligned price matrix. Matrices are kept symbol-major so that each window
+    # is a contiguous slice
+    close, dates, symbols = build_price_matrix(prices, "Close")
+    close = np.ascontiguousarray(close.T)
+    traded = ~np.isnan(close)
+
+    # Simple returns on each symbol's own trading days: the dates combine
+    # several exchanges, so a symbol has no price on its exchange holidays.
+    # Each return runs from the symbol's previous close, so the move across a
+    # holiday is kept on the next trading day instead of being lost
+    previous = close[np.arange(len(symbols))[:, None], _forward_fill_index(traded)]
+    returns = np.full_like(close, np.nan)
+    returns[:, 1:] = close[:, 1:] / previous[:, :-1] - 1.0
+
+    # Market returns, if a benchmark is used
+    market = None
+    if market_symbol is not None and market_symbol not in symbols:
+        print(f"⚠️ Market symbol '{market_symbol}' not found in prices. "
+              "Falling back to the mean-adjusted model.")
+        market_symbol = None
+    if market_symbol is not None:
+        market = returns[symbols.get_loc(market_symbol)]
+
+    # Log volume matrix aligned on the same dates and symbols
+    log_volume = None
+    volume_source = volumes if volumes is not None else prices
+    if "Volume" in volume_source.columns:
+        vol, vol_dates, vol_symbols = build_price_matrix(volume_source, "Volume")
+        vol = pd.DataFrame(vol, index=vol_dates, columns=vol_symbols) \
+                .reindex(index=dates, columns=symbols).to_numpy(dtype=float).T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_volume = np.ascontiguousarray(np.log(np.where(vol > 0, vol, np.nan)))
+
+    # Build the (event, symbol) pairs
+    event_dates = pd.to_datetime(events[event_date_col], errors="coerce")
+    event_ids = events[event_id_col].to_numpy() if event_id_col else np.arange(len(events))
+
+    if symbol_col in events.columns:
+        pair_event = np.arange(len(events))
+        pair_symbol = symbols.get_indexer(events[symbol_col])
+    else:
+        pair_event = np.repeat(np.arange(len(events)), len(symbols))
+        pair_symbol = np.tile(np.arange(len(symbols)), len(events))
+
+    if market_symbol is not None:
+        keep = pair_symbol != symbols.get_loc(market_symbol)
+        pair_event, pair_symbol = pair_event[keep], pair_symbol[keep]
+
+    # Map each event date to the symbol's first trading day on or after it
+    day_index = dates.searchsorted(event_dates.dt.tz_localize(None).dt.normalize().to_numpy())
+    anchor = day_index[pair_event]
+
+    keep = (pair_symbol >= 0) & event_dates.notna().to_numpy()[pair_event] & (anchor < len(dates))
+    pair_event, pair_symbol, anchor = pair_event[keep], pair_symbol[keep], anchor[keep]
+
+    anchor = _next_valid_index(traded)[pair_symbol, anchor]
+    keep = anchor < len(dates)
+    pair_event, pair_symbol, anchor = pair_event[keep], pair_symbol[keep], anchor[keep]
+
+    if len(anchor) == 0:
+        print("⚠️ No event could be aligned with the price history.")
+        return pd.DataFrame(), pd.DataFrame()
+
+    print(f"🔍 Running event study on {len(anchor)} (event, symbol) pairs...")
+
+    _window_offsets(estimation_window)  # Only validates the window bounds
+    evt_offsets = _window_offsets(event_window)
+    evt_rows = anchor[:, None] + evt_offsets[None, :]  # (K, L_evt)
+    n_days = len(dates)
+
+    # Fit the normal-return model on the estimation window from prefix sums of
+    # the moments, so the estimation window length does not matter
+    if market is None:
+        valid = ~np.isnan(returns)
+        y = np.where(valid, returns, 0.0)
+        n_est, s_y, s_yy = _window_sums(
+            [_prefix_sums(m) for m in (valid, y, y * y)],
+            pair_symbol, anchor, estimation_window, n_days,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            alpha = s_y / n_est
+            ssr = s_yy - n_est * alpha ** 2
+        expected = alpha[:, None]
+    else:
+        valid = ~np.isnan(returns) & ~np.isnan(market)[None, :]
+        y = np.where(valid, returns, 0.0)
+        x = np.where(valid, market[None, :], 0.0)
+        n_est, s_x, s_y, s_xx, s_xy, s_yy = _window_sums(
+            [_prefix_sums(m) for m in (valid, x, y, x * x, x * y, y * y)],
+            pair_symbol, anchor, estimation_window, n_days,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_x, mean_y = s_x / n_est, s_y / n_est
+            cov = s_xy / n_est - mean_x * mean_y
+            var_x = s_xx / n_est - mean_x ** 2
+            var_y = s_yy / n_est - mean_y ** 2
+            beta = np.where(var_x > 0, cov / var_x, np.nan)
+            alpha = mean_y - beta * mean_x
+            ssr = n_est * (var_y - beta * cov)
+        expected = alpha[:, None] + beta[:, None] * _gather(market, evt_rows)
+
+    n_est = np.rint(n_est).astype(int)
+    enough = n_est >= min_estimation_obs
+
+    # Residual standard deviation (ddof=2 for the market model, 1 otherwise)
+    ddof = 1 if market is None else 2
+    dof = np.maximum(n_est - ddof, 1)
+    sigma = np.sqrt(np.maximum(ssr, 0.0) / dof)
+
+    abnormal = _gather(returns, evt_rows, pair_symbol) - expected
+    abnormal[~enough] = np.nan
+    car = np.nancumsum(abnormal, axis=1)
+    car[np.isnan(abnormal).all(axis=1)] = np.nan
+
+    n_evt = (~np.isnan(abnormal)).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        car_t = car[:, -1] / (sigma * np.sqrt(n_evt))
+
+    # Volume shocks: standardized log volume against the estimation window
+    if log_volume is not None:
+        valid = ~np.isnan(log_volume)
+        v = np.where(valid, log_volume, 0.0)
+        n_vol, s_v, s_vv = _window_sums(
+            [_prefix_sums(m) for m in (valid, v, v * v)],
+            pair_symbol, anchor, estimation_window, n_days,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_v = s_v / n_vol
+            std_v = np.sqrt(np.maximum(s_vv - n_vol * mean_v ** 2, 0.0) / (n_vol - 1))
+            vol_shock = (_gather(log_volume, evt_rows, pair_symbol) - mean_v[:, None]) \
+                        / std_v[:, None]
+        vol_shock[~np.isfinite(vol_shock)] = np.nan
+        peak_vol_shock = np.nanmax(np.abs(vol_shock), axis=1, initial=-np.inf)
+        peak_vol_shock[~np.isfinite(peak_vol_shock)] = np.nan
+    else:
+        vol_shock = np.full_like(abnormal, np.nan)
+        peak_vol_shock = np.full(len(anchor), np.nan)
+
+    event_id = event_ids[pair_event]
+    symbol = symbols.to_numpy()[pair_symbol]
+    now = datetime.utcnow()
+
+    summary = pd.DataFrame({
+        "event_id": event_id,
+        "event_date": event_dates.to_numpy()[pair_event],
+        "symbol": symbol,
+        "event_trading_day": dates.to_numpy()[anchor],
+        "estimation_obs": n_est,
+        "car": car[:, -1],
+        "car_t_stat": car_t,
+        "peak_abs_volume_shock": peak_vol_shock,
+        "transformed_at": now,
+    })
+
+    n_pairs, n_offsets = abnormal.shape
+    detail = pd.DataFrame({
+        "event_id": np.repeat(event_id, n_offsets),
+        "symbol": np.repeat(symbol, n_offsets),
+        "offset": np.tile(evt_offsets, n_pairs),
+        "date": _gather_dates(dates, evt_rows).ravel(),
+        "abnormal_return": abnormal.ravel(),
+        "cumulative_abnormal_return": car.ravel(),
+        "volume_shock": vol_shock.ravel(),
+    })
+
+    print(f"✅ Event study complete ({len(summary)} pairs, {len(detail)} rows).")
+    return summary, detail
@@ -1,18 +1,15 @@
-from bs4 import BeautifulSoup
-from io import StringIO
-import ssl, certifi
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+from io import BytesIO
+from itertools import product
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 import os
+import numpy as np
 import pandas as pd
 
-
-# Create SSL context that uses the certificate authority (CA) bundle
-# This ensures that HTTPS requests trust certificates signed by recognized authorities
-ssl_context = ssl.create_default_context(cafile=certifi.where())
-# Overrides the default HTTPS context used by Python
-ssl._create_default_https_context = lambda: ssl_context
+from src.http_client import http_client
 
 # Load environment variables
 load_dotenv()
@@ -28,11 +25,11 @@ def extract_airports():
     print("🛫 Fetching all airports from OurAirports open dataset...")
     url = "https://ourairports.com/data/airports.csv"
 
-    import ssl
-    ssl._create_default_https_context = ssl._create_unverified_context
-
     try:
-        df = pd.read_csv(url)
+        res = http_client.get(url)
+        res.raise_for_status()
+        # Only empty cells are missing: "NA" is Namibia's country code
+        df = pd.read_csv(BytesIO(res.content), keep_default_na=False, na_values=[""])
         df["Fetched At"] = datetime.utcnow()
 
         print(f"✅ Airports dataset fetched successfully ({len(df)} records).")
@@ -45,53 +42,182 @@ def extract_airports():
 
 # Air traffic statistics from USA
 
-def extract_transtats():
+TRANSTATS_URL = "https://www.transtats.bts.gov/Data_Elements.aspx"
+
+# Columns kept from the TranStats result tables
+TRANSTATS_COLUMNS = ["Year", "Month", "DOMESTIC", "INTERNATIONAL", "TOTAL"]
+
+
+class _TranStatsParser(HTMLParser):
+    """
+    Streaming parser for TranStats result pages.
+
+    The page is read in a single pass: the hidden ASP.NET form fields are
+    captured, and only the cells of tables with a header row holding all the
+    `columns` are kept (and only those columns). Other tables are skipped
+    without keeping any row.
+    """
+
+    def __init__(self, columns):
+        super().__init__()
+        self.columns = columns
+        self.hidden_fields = {}
+        self.rows = None         # Rows of the last matching table, None if none matched
+        self._tables = []        # Stack of [keep, column positions, rows] for open tables
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "input":
+            attrs = dict(attrs)
+            if attrs.get("type") == "hidden" and attrs.get("name"):
+                self.hidden_fields[attrs["name"]] = attrs.get("value") or ""
+        elif tag == "table":
+            # Undecided (None) until a header row has been read
+            self._tables.append([None, None, []])
+        elif tag == "tr" and self._tables:
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            self._cell = []
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            self._row.append("".join(self._cell).strip())
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            table = self._tables[-1]
+            if table[0] is None:
+                # Rows before the header (captions, grouped headings...) are skipped
+                # until one holds every needed column
+                if all(col in self._row for col in self.columns):
+                    table[0] = True
+                    table[1] = [self._row.index(col) for col in self.columns]
+            elif len(self._row) > max(table[1]):
+                table[2].append([self._row[i] for i in table[1]])
+            self._row = None
+        elif tag == "table" and self._tables:
+            keep, _, rows = self._tables.pop()
+            if keep:
+                self.rows = rows
+
+
+def _parse_transtats(html, columns=TRANSTATS_COLUMNS):
+    """
+    Return (result DataFrame, hidden form fields) of a TranStats page.
+
+    Raises:
+    ------
+    ValueError
+        If no table of the page has a header row with all the `columns`.
+    """
+    parser = _TranStatsParser(columns)
+    parser.feed(html)
+    parser.close()
+
+    if parser.rows is None:
+        raise ValueError(f"no result table with the columns {columns} in the page")
+
+    df = pd.DataFrame(parser.rows, columns=columns)
+    for col in columns:
+        if col != "Month":  # "Month" also holds the yearly "TOTAL" rows
+            df[col] = pd.to_numeric(df[col].str.replace(",", ""), errors="coerce")
+    return df, parser.hidden_fields
+
+
+def extract_transtats(datasets=(1,), airports=("All",), carriers=("All",), max_workers=4):
     """
     📊 Extract monthly air traffic statistics from the TranStats (BTS) portal.
-    The data includes domestic and international passenger volumes by month and year.
+    The data includes domestic and international volumes by month and year.
+
+    Every (dataset, airport, carrier) combination is queried concurrently.
+    Each worker keeps its own ASP.NET session and reuses the hidden form
+    fields (`__VIEWSTATE`...) captured from its previous page, so the form
+    is only loaded once per session and dataset.
+
+    Parameters:
+    ----------
+    datasets : iterable of int, optional
+        TranStats `Data` ids to fetch (default is (1,), passengers).
+    airports : iterable of str, optional
+        Airport codes, or "All" (default is ("All",)).
+    carriers : iterable of str, optional
+        Carrier codes, or "All" (default is ("All",)).
+    max_workers : int, optional
+        Number of concurrent sessions (default is 4). Requests to the host
+        are also capped by the shared HTTP client.
+
+    Returns:
+    -------
+        pandas.DataFrame: One row per (dataset, airport, carrier, year, month).
     """
 
     print("🌐 Fetching air traffic data from TranStats (Bureau of Transportation Statistics)...")
 
-    # TranStats URL and parameters
-    url = "https://www.transtats.bts.gov/Data_Elements.aspx"
-    params = {"Data": "1"}  # Example dataset ID (air traffic summary)
+    queries = list(product(datasets, airports, carriers))
+    local = threading.local()
 
-    try:
-        # Start session
-        session = requests.Session()
+    def fetch(query):
+        dataset, airport, carrier = query
+        params = {"Data": str(dataset)}
 
-        # Access the initial form page
-        resp = session.get(url, params=params)
-        soup = BeautifulSoup(resp.text, "html.parser")
+        # Session of this worker (keeps the ASP.NET cookies, shares the client's connection pool)
+        if not hasattr(local, "session"):
+            local.session = http_client.new_session()
+            local.form_fields = {}
 
-        # Capture hidden ASP.NET form fields
-        data = {i.get("name"): i.get("value", "") for i in soup.find_all("input", type="hidden")}
+        # Access the form page only the first time this session sees the dataset
+        if dataset not in local.form_fields:
+            resp = http_client.get(TRANSTATS_URL, session=local.session, params=params)
+            resp.raise_for_status()
+            parser = _TranStatsParser(TRANSTATS_COLUMNS)
+            parser.feed(resp.text)
+            parser.close()
+            local.form_fields[dataset] = parser.hidden_fields
 
-        # Add query parameters (example filter)
+        data = dict(local.form_fields[dataset])
         data.update({
-            "AirportList": "All",
-            "CarrierList": "All",
+            "AirportList": airport,
+            "CarrierList": carrier,
             "Submit": "Submit"
         })
 
         # Submit form (POST request)
-        resp2 = session.post(url, params=params, data=data)
-
-        # Extract HTML table(s)
-        dfs = pd.read_html(StringIO(resp2.text))
-        df = dfs[-1]
-        df["Fetched At"] = datetime.utcnow()
+        resp = http_client.post(TRANSTATS_URL, session=local.session, params=params, data=data)
+        resp.raise_for_status()
 
-        print(f"✅ TranStats data fetched successfully ({len(df)} records).")
-        print("Returned dataset")
+        df, hidden_fields = _parse_transtats(resp.text)
+        if hidden_fields:
+            local.form_fields[dataset] = hidden_fields
 
+        df.insert(0, "Dataset", dataset)
+        df.insert(1, "Airport", airport)
+        df.insert(2, "Carrier", carrier)
         return df
 
-    except Exception as e:
-        print(f"⚠️ Failed to fetch TranStats data: {e}")
+    dfs = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, query): query for query in queries}
+        for future in as_completed(futures):
+            try:
+                dfs.append(future.result())
+            except Exception as e:
+                print(f"⚠️ Failed to fetch TranStats data for {futures[future]}: {e}")
+
+    if not dfs:
         return pd.DataFrame()
 
+    df = pd.concat(dfs, ignore_index=True)
+    df["Fetched At"] = datetime.utcnow()
+
+    print(f"✅ TranStats data fetched successfully ({len(df)} records from "
+          f"{len(dfs)}/{len(queries)} queries).")
+
+    return df
+
 # Amadeus endpoints
 AMADEUS_TOKEN_URL = "https://test.api.amadeus.com/v1/security/oauth2/token"
 AMADEUS_FLIGHTS_URL = "https://test.api.amadeus.com/v2/shopping/flight-offers"  
@@ -99,7 +225,7 @@ AMADEUS_FLIGHTS_URL = "https://test.api.amadeus.com/v2/shopping/flight-offers"
 # Obtain API token
 def get_amadeus_token():
     try:
-        res = requests.post(
+        res = http_client.post(
             AMADEUS_TOKEN_URL,
             data={
                 "grant_type": "client_credentials",
@@ -115,11 +241,117 @@ def get_amadeus_token():
         print(f"⚠️ Amadeus token request failed: {e}")
         return None
 
+# ISO-8601 durations as returned by Amadeus (e.g. "PT7H35M", "P1DT2H")
+_ISO_DURATION = r"^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+
+# Segment columns, in the order they are collected by `_parse_flight_offers`
+_SEGMENT_FIELDS = ["origin", "destination", "departure", "arrival",
+                   "carrier_code", "flight_number", "duration"]
+
+
+def _parse_flight_offers(data, offer_prefix=""):
+    """
+    Flatten an Amadeus flight-offers response into typed column arrays.
+
+    The response is walked once, appending straight into one list per column.
+    Segments shared by several offers are stored only once and every offer
+    keeps a mapping to the positions of its segments. Datetimes and ISO-8601
+    durations are then decoded in bulk for the whole response.
+
+    Parameters:
+    ----------
+    data : dict
+        Decoded JSON body of the flight-offers endpoint.
+    offer_prefix : str, optional
+        Prefix added to the Amadeus offer ids, which are only unique
+        within one response (default is "").
+
+    Returns:
+    -------
+    tuple (pandas.DataFrame, pandas.DataFrame)
+        - segments: one row per unique segment, identified by a 64-bit hash
+          `segment_id` of its carrier, flight number, origin and departure
+          time (as sent by Amadeus, i.e. the de-duplication key).
+        - offer_segments: one row per (offer, segment) with the offer id,
+          the position of the segment in the offer, its `segment_id` and the
+          offer price.
+    """
+    columns = {field: [] for field in _SEGMENT_FIELDS}
+    segment_positions = {}
+    offer_ids, offer_prices, segment_order, segment_rows = [], [], [], []
+
+    for offer in data.get("data", ()):
+        offer_id = f"{offer_prefix}{offer.get('id')}"
+        price = (offer.get("price") or {}).get("total")
+        order = 0
+
+        for itinerary in offer.get("itineraries", ()):
+            for segment in itinerary.get("segments", ()):
+                departure = segment.get("departure") or {}
+                arrival = segment.get("arrival") or {}
+                key = (segment.get("carrierCode"), segment.get("number"),
+                       departure.get("iataCode"), departure.get("at"))
+
+                position = segment_positions.get(key)
+                if position is None:
+                    position = segment_positions[key] = len(segment_positions)
+                    columns["origin"].append(departure.get("iataCode"))
+                    columns["destination"].append(arrival.get("iataCode"))
+                    columns["departure"].append(departure.get("at"))
+                    columns["arrival"].append(arrival.get("at"))
+                    columns["carrier_code"].append(segment.get("carrierCode"))
+                    columns["flight_number"].append(segment.get("number"))
+                    columns["duration"].append(segment.get("duration"))
+
+                offer_ids.append(offer_id)
+                offer_prices.append(price)
+                segment_order.append(order)
+                segment_rows.append(position)
+                order += 1
+
+    segments = pd.DataFrame(columns)
+
+    # Hash the same raw fields used for de-duplication, so one id is one segment
+    key_cols = ["carrier_code", "flight_number", "origin", "departure"]
+    segments.insert(0, "segment_id", pd.util.hash_pandas_object(
+        segments[key_cols].astype("object"), index=False).to_numpy().view("int64"))
+
+    # Vectorized decoding of the whole response
+    for col in ["departure", "arrival"]:
+        segments[col] = pd.to_datetime(segments[col], format="ISO8601", errors="coerce")
+
+    parts = segments["duration"].astype("string").str.extract(_ISO_DURATION).astype("float64")
+    segments["duration_minutes"] = (parts[0].fillna(0) * 1440 + parts[1].fillna(0) * 60
+                                    + parts[2].fillna(0) + parts[3].fillna(0) / 60)
+    segments.loc[parts.isna().all(axis=1), "duration_minutes"] = np.nan
+    segments = segments.drop(columns="duration")
+
+    offer_segments = pd.DataFrame({
+        "offer_id": offer_ids,
+        "segment_order": np.asarray(segment_order, dtype="int64"),
+        "segment_id": segments["segment_id"].to_numpy()[np.asarray(segment_rows, dtype="int64")],
+        "price_EUR": pd.to_numeric(pd.Series(offer_prices, dtype="object"), errors="coerce"),
+    })
+
+    return segments, offer_segments
+
+
 # Extract flight offers
-def extract_flight_offers(origin, destination, date):
+def extract_flight_offers(origin, destination, date, max_offers=20):
+    """
+    Fetch the flight offers of one route and date.
+
+    Returns:
+    -------
+    tuple (pandas.DataFrame, pandas.DataFrame)
+        The de-duplicated segments and the offer-to-segment mapping
+        (see `_parse_flight_offers`). Both are empty on failure.
+    """
+    empty = (pd.DataFrame(), pd.DataFrame())
+
     token = get_amadeus_token()
     if not token:
-        return pd.DataFrame()
+        return empty
 
     headers = {"Authorization": f"Bearer {token}"}
     params = {
@@ -128,53 +360,53 @@ def extract_flight_offers(origin, destination, date):
         "departureDate": date,
         "adults": 1,
         "currencyCode": "EUR",
-        "max": 20,  # limit to 20 offers
+        "max": max_offers,
     }
 
     try:
-        res = requests.get(AMADEUS_FLIGHTS_URL, headers=headers, params=params)
+        res = http_client.get(AMADEUS_FLIGHTS_URL, headers=headers, params=params)
         res.raise_for_status()
-        data = res.json()
-
-        flights = []
-        for offer in data.get("data", []):
-            price = offer.get("price", {}).get("total")
-            for itinerary in offer.get("itineraries", []):
-                for segment in itinerary.get("segments", []):
-                    flights.append({
-                        "origin": segment.get("departure", {}).get("iataCode"),
-                        "destination": segment.get("arrival", {}).get("iataCode"),
-                        "departure": segment.get("departure", {}).get("at"),
-                        "arrival": segment.get("arrival", {}).get("at"),
-                        "carrier_code": segment.get("carrierCode"),
-                        "flight_number": segment.get("number"),
-                        "duration": segment.get("duration"),
-                        "price_EUR": price,
-                        "Fetched At": datetime.utcnow(),
-                    })
-
-        df = pd.DataFrame(flights)
-        if not df.empty:
-            print(f"💾 Fetched Amadeus flight offers  ({len(df)} records)")
+
+        segments, offer_segments = _parse_flight_offers(
+            res.json(), offer_prefix=f"{origin}-{destination}-{date}-")
+
+        fetched_at = datetime.utcnow()
+        segments["Fetched At"] = fetched_at
+        offer_segments["Fetched At"] = fetched_at
+
+        if not offer_segments.empty:
+            print(f"💾 Fetched Amadeus flight offers  ({offer_segments['offer_id'].nunique()} offers, "
+                  f"{len(segments)} unique segments)")
         else:
             print(f"⚠️ No flight offers found for {origin}-{destination} on {date}")
-        return df
+        return segments, offer_segments
 
     except Exception as e:
         print(f"⚠️ Amadeus flight fetch failed: {e}")
-        return pd.DataFrame()
+        return empty
 
 # Run extraction for multiple routes
 def run_amadeus_extraction():
-    df = pd.DataFrame(columns=["origin","destination","departure", "arrival",
-                               "carrier_code", "flight_number", "duration",
-                               "price_EUR", "Fetched At"])
-    
+    """
+    Run the Amadeus extraction for every route.
+
+    Returns:
+    -------
+    tuple (pandas.DataFrame, pandas.DataFrame)
+        Segments de-duplicated across all routes, and the offer-to-segment mapping.
+    """
     print("✈️ Starting Amadeus extraction...")
     routes = [("CDG", "JFK", "2025-10-25"), ("LHR", "LAX", "2025-10-26")]
-    for origin, dest, date in routes:
-        df_aux = extract_flight_offers(origin, dest, date)
-        df = pd.concat([df, df_aux], ignore_index=True)
-    
+
+    results = [extract_flight_offers(origin, dest, date) for origin, dest, date in routes]
+    segments = [seg for seg, _ in results if not seg.empty]
+    offer_segments = [off for _, off in results if not off.empty]
+
+    if segments:
+        segments = pd.concat(segments, ignore_index=True).drop_duplicates("segment_id")
+        offer_segments = pd.concat(offer_segments, ignore_index=True)
+    else:
+        segments, offer_segments = pd.DataFrame(), pd.DataFrame()
+
     print("✅ Amadeus extraction complete.")
-    return df
+    return segments, offer_segments
@@ -7,61 +7,46 @@ from selenium.webdriver.common.by import By
 from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 
+from src.http_client import http_client
 
-def _static_get_request(url, max_retries = 3, delay = 5):
+
+def _static_get_request(url):
     """
-    Sends a GET request to the specified URL with retry logic for server-side errors.
+    Sends a GET request to the specified URL through the shared HTTP client.
+
+    Timeouts and retries of server-side errors (with exponential backoff) are
+    handled by `src/http_client.py`.
 
     Parameters:
     ----------
     url : str
         The URL to send the GET request to.
-    max_retries : int, optional
-        Maximum number of retry attempts for server-side errors (default is 3).
-    delay : int or float, optional
-        Delay in seconds between retries (default is 5).
 
     Returns:
     -------
     requests.Response or None
         The response object if the request is successful.
-        Returns None if the request fails due to client-side errors, request exceptions,
+        Returns None if the request fails due to HTTP errors, request exceptions,
         or if all retry attempts for server-side errors fail.
     """
     
     print("\tSending a get request to the server...")
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(url)
-            status = response.status_code
-            response.raise_for_status()  # Raise any HTTP errors
-
-            print("\tRequest successful!")
-            return response
-
-        except requests.exceptions.HTTPError as e:
-            # Retry only with server-side errors
-            is_server_error = (500 <= status < 600)
-
-            if not is_server_error:
-                print(f"\033[91mAttempt {attempt + 1} failed with HTTP error: {e}\033[0m")
-                return None
-            elif attempt < max_retries - 1:
-                print(f"\033[93mAttempt {attempt + 1} failed with server-side error error:\033[0m")
-                print(e)
-                print(f"Retrying in {delay} seconds...")
-                time.sleep(delay)
-            else:
-                print(f"\033[93mAttempt {attempt + 1} failed with server-side error error:\033[0m")
-                print(e)
-                print("\033[91mAll retries failed due to server errors.\033[0m")
-                return None
-
-        except requests.exceptions.RequestException as e:
-            # Catch other request-related issues (e.g., DNS failure, timeout)
-            print("\033[91mRequest failed due to GET request exception:\033[0m")
-            print(e)
-            return None
+    try:
+        response = http_client.get(url)
+        response.raise_for_status()  # Raise any HTTP errors
+
+        print("\tRequest successful!")
+        return response
+
+    except requests.exceptions.HTTPError as e:
+        print(f"\033[91mRequest failed with HTTP error: {e}\033[0m")
+        return None
+
+    except requests.exceptions.RequestException as e:
+        # Catch other request-related issues (e.g., DNS failure, timeout)
+        print("\033[91mRequest failed due to GET request exception:\033[0m")
+        print(e)
+        return None
 
 
 def _wait_for_all_blocks(driver, timeout=20, check_interval=2):
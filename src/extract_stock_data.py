@@ -15,6 +15,9 @@ FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
 with open("companies.json", "r") as f:
     companies = json.load(f)
 
+# Market benchmark used as the normal-return reference in event studies
+BENCHMARK_SYMBOL = "^GSPC"
+
 
 def _extract_yahoo():
     """
@@ -171,5 +174,55 @@ def run_stock_extraction():
     return df
 
 
+def extract_price_history(symbols=None, period="10y"):
+    """
+    Extract daily price and volume history from Yahoo Finance.
+
+    All symbols are downloaded in a single batched request and returned in
+    long format, ready to be pivoted by `src/event_study.py`.
+
+    Parameters:
+    ----------
+    symbols : list of str, optional
+        Tickers to download. Defaults to every company in `companies` plus
+        the `BENCHMARK_SYMBOL`.
+    period : str, optional
+        History length understood by Yahoo Finance (default is "10y").
+
+    Returns:
+    -------
+        pandas.DataFrame: One row per (Date, Symbol) with the adjusted
+        "Close" price and the "Volume".
+    """
+    if symbols is None:
+        symbols = list(companies.values()) + [BENCHMARK_SYMBOL]
+
+    # ANSI coded for blue
+    print(f"\n\n\033[94mFetching {period} of price history for {len(symbols)} symbols...\033[0m")
+
+    try:
+        data = yf.download(symbols, period=period, auto_adjust=True,
+                           group_by="column", progress=False)
+    except Exception as e:
+        # \033[91m is the ANSI escape code for red
+        print(f"\033[91m[ERROR] Yahoo price history download failed: {e}\033[0m")
+        return pd.DataFrame(columns=["Date", "Symbol", "Close", "Volume"])
+
+    df = (
+        data[["Close", "Volume"]]
+        .stack(level=1, future_stack=True)
+        .dropna(subset=["Close"])
+        .reset_index()
+    )
+    df.columns = ["Date", "Symbol", "Close", "Volume"]
+
+    missing = set(symbols) - set(df["Symbol"])
+    if missing:
+        print(f"\033[93mNo price history for: {', '.join(sorted(missing))}\033[0m")
+
+    print(f"\033[92mFetched {len(df)} daily prices.\033[0m")
+    return df
+
+
 if __name__ == "__main__":
     run_stock_extraction()
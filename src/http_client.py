@@ -0,0 +1,235 @@
+"""
+Shared HTTP Client for AeroInvest
+
+Every extractor goes through this module instead of calling `requests`
+directly, so that all outgoing traffic gets the same guarantees:
+
+- one connection pool per host, reused across requests and sessions;
+- connect and read timeouts on every request;
+- exponential backoff with jitter on transient failures, honoring `Retry-After`;
+- a cap on the number of concurrent requests per host;
+- request-level counters per host (see `HttpClient.stats`).
+"""
+
+import random
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Status codes worth retrying: rate limiting and transient server-side errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HttpClient:
+    """
+    Thread-safe HTTP client with per-host pooling, timeouts, retries and counters.
+
+    Parameters:
+    ----------
+    connect_timeout : float, optional
+        Seconds to wait for the TCP/TLS connection (default is 5).
+    read_timeout : float, optional
+        Seconds to wait between bytes of the response (default is 30).
+    max_retries : int, optional
+        Retries after the first attempt for transient failures (default is 3).
+    backoff_base : float, optional
+        Base delay in seconds of the exponential backoff (default is 1).
+    backoff_max : float, optional
+        Upper bound in seconds of any single wait, including `Retry-After` (default is 60).
+    max_per_host : int, optional
+        Maximum number of concurrent requests to the same host (default is 4).
+    pool_size : int, optional
+        Number of keep-alive connections kept per host (default is 10).
+    """
+
+    def __init__(self, connect_timeout=5, read_timeout=30, max_retries=3,
+                 backoff_base=1.0, backoff_max=60.0, max_per_host=4, pool_size=10):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_per_host = max_per_host
+        self.pool_size = pool_size
+
+        self._lock = threading.Lock()
+        self._adapters = {}
+        self._semaphores = {}
+        self._stats = defaultdict(lambda: defaultdict(float))
+        self._session = self.new_session()
+
+    # ------------------------------------------------------------------
+    # Sessions and per-host resources
+    # ------------------------------------------------------------------
+    def new_session(self):
+        """
+        Create a `requests.Session` with its own cookies that shares this
+        client's per-host connection pools. Use it for stateful sites
+        (e.g. ASP.NET forms) and pass it back through `session=`.
+        """
+        session = requests.Session()
+        session.headers["User-Agent"] = "AeroInvest-ETL/0.1"
+        return session
+
+    def _host_resources(self, url):
+        """Return the (prefix, adapter, semaphore) shared by every request to the host of `url`."""
+        parts = urlsplit(url)
+        prefix = f"{parts.scheme}://{parts.netloc}/"
+
+        with self._lock:
+            if prefix not in self._adapters:
+                # Retries are handled by `request`, so the adapter never retries itself
+                self._adapters[prefix] = HTTPAdapter(pool_connections=1,
+                                                     pool_maxsize=self.pool_size,
+                                                     max_retries=0)
+                self._semaphores[prefix] = threading.BoundedSemaphore(self.max_per_host)
+            return prefix, self._adapters[prefix], self._semaphores[prefix]
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def _count(self, host, key, value=1):
+        with self._lock:
+            self._stats[host][key] += value
+
+    def _retry_delay(self, attempt, response=None):
+        """Full-jitter exponential backoff, or the server's `Retry-After` when given."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    when = parsedate_to_datetime(retry_after)
+                    delay = (when - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    pass
+
+        return min(max(delay, 0.0), self.backoff_max)
+
+    def request(self, method, url, session=None, **kwargs):
+        """
+        Send an HTTP request, retrying transient failures.
+
+        Connection errors, timeouts and the statuses in `RETRY_STATUSES` are
+        retried up to `max_retries` times. Other responses are returned as-is,
+        so callers keep using `response.raise_for_status()`.
+
+        Parameters:
+        ----------
+        method : str
+            HTTP method ("GET", "POST", ...).
+        url : str
+            Target URL.
+        session : requests.Session, optional
+            Session created by `new_session` to keep cookies between calls.
+            Defaults to the client's shared session.
+        **kwargs
+            Passed to `requests.Session.request`. A `timeout` overrides the
+            client's (connect, read) timeouts.
+
+        Returns:
+        -------
+        requests.Response
+            The last response received (possibly a retryable error status if
+            every attempt failed).
+
+        Raises:
+        ------
+        requests.exceptions.RequestException
+            If the last attempt failed without any response (e.g. timeout).
+        """
+        session = session or self._session
+        prefix, adapter, semaphore = self._host_resources(url)
+        with self._lock:
+            if session.adapters.get(prefix) is not adapter:
+                session.mount(prefix, adapter)
+
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+
+        for attempt in range(self.max_retries + 1):
+            response, error = None, None
+            start = time.perf_counter()
+
+            with semaphore:
+                try:
+                    response = session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    error = e
+
+            self._count(host, "requests")
+            self._count(host, "seconds", time.perf_counter() - start)
+
+            if error is not None:
+                self._count(host, "errors")
+            else:
+                self._count(host, f"status_{response.status_code // 100}xx")
+                if kwargs.get("stream"):
+                    self._count(host, "bytes", int(response.headers.get("Content-Length", 0)))
+                else:
+                    self._count(host, "bytes", len(response.content))
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+
+            if attempt == self.max_retries:
+                break
+
+            delay = self._retry_delay(attempt, response)
+            reason = error if error is not None else f"HTTP {response.status_code}"
+            print(f"\033[93m{method} {url} attempt {attempt + 1} failed ({reason}). "
+                  f"Retrying in {delay:.1f} seconds...\033[0m")
+            self._count(host, "retries")
+            time.sleep(delay)
+
+        if error is not None:
+            raise error
+        return response
+
+    def get(self, url, **kwargs):
+        """Send a GET request (see `request`)."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """Send a POST request (see `request`)."""
+        return self.request("POST", url, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Counters
+    # ------------------------------------------------------------------
+    def stats(self):
+        """
+        Return a snapshot of the request counters.
+
+        Returns:
+        -------
+        dict
+            Host -> counters (`requests`, `retries`, `errors`, `status_2xx`...,
+            `bytes` and cumulated `seconds`).
+        """
+        with self._lock:
+            return {
+                host: {key: value if key == "seconds" else int(value)
+                       for key, value in counters.items()}
+                for host, counters in self._stats.items()
+            }
+
+    def print_stats(self):
+        """Print the request counters, one line per host."""
+        for host, counters in sorted(self.stats().items()):
+            print(f"🌐 {host}: {int(counters.get('requests', 0))} requests, "
+                  f"{int(counters.get('retries', 0))} retries, "
+                  f"{int(counters.get('errors', 0))} errors, "
+                  f"{counters.get('bytes', 0) / 1e6:.1f} MB in {counters.get('seconds', 0):.1f} s")
+
+
+# Client shared by every extractor
+http_client = HttpClient()
@@ -41,6 +41,20 @@ def load_to_db(df: pd.DataFrame, table_name: str, if_exists: str = "replace"):
         engine.dispose()
 
 
+def record_etl_run(run_id: str):
+    """
+    📝 Record a finished ETL run in the `etl_runs` table
+
+    Readers of the loaded tables (e.g. the cached read API in `src/api.py`)
+    watch the latest run id to know when their cached results are stale.
+
+    Args:
+        run_id (str): Identifier of the run whose tables were just loaded
+    """
+    run = pd.DataFrame({"run_id": [run_id], "finished_at": [datetime.utcnow()]})
+    load_to_db(run, "etl_runs", if_exists="append")
+
+
 
 def verify_data():
     """
@@ -0,0 +1,205 @@
+"""
+Stage Profiling Module for AeroInvest
+
+Opt-in profiling of the ETL stages (`python main.py --profile`). Each wrapped
+extract, transform or load call gets:
+
+- a deterministic `cProfile` profile saved as `<stage>.pstats`
+  (open it with `python -m pstats` or snakeviz);
+- a sampled call-stack profile in the collapsed-stack format
+  (`<stage>.collapsed`) understood by flamegraph.pl and speedscope;
+- its peak traced memory and top allocation sites (`tracemalloc`).
+
+Threaded stages (e.g. the concurrent TranStats queries) are covered too: the
+sampler records every thread, each stack being rooted at its thread name, and
+threads started while a stage runs get their own `cProfile` profile, merged
+into the stage's `.pstats`. Threads started before the stage only show up in
+the sampled profile.
+
+A `summary.txt` with the top-N hot functions of every stage is written next
+to them. When profiling is off, `StageProfiler.call` simply calls the
+function, so the pipeline pays nothing.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+
+class _StackSampler(threading.Thread):
+    """
+    Background thread sampling the call stacks of every other thread at a
+    fixed interval and counting identical stacks (collapsed-stack format).
+    Each stack starts with the name of its thread.
+    """
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class StageProfiler:
+    """
+    Wraps pipeline stages and, when enabled, profiles each of them.
+
+    Parameters:
+    ----------
+    enabled : bool, optional
+        Whether to profile the stages (default is False).
+    output_dir : str or pathlib.Path, optional
+        Folder in which a timestamped sub-folder is created for the profiles
+        of this run (default is "profiles").
+    top_n : int, optional
+        Number of hot functions and allocation sites reported per stage (default is 15).
+    sample_interval : float, optional
+        Seconds between two stack samples (default is 0.005).
+    """
+
+    def __init__(self, enabled=False, output_dir="profiles", top_n=15, sample_interval=0.005):
+        self.enabled = enabled
+        self.top_n = top_n
+        self.sample_interval = sample_interval
+        self.results = []
+        self.run_dir = None
+
+        if enabled:
+            self.run_dir = Path(output_dir) / datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+
+    def call(self, stage, func, *args, **kwargs):
+        """
+        Call `func(*args, **kwargs)`, profiling it as `stage` when enabled.
+
+        Returns:
+        -------
+            Whatever `func` returns. Exceptions are propagated after the
+            profile of the stage has been saved.
+        """
+        if not self.enabled:
+            return func(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        sampler = _StackSampler(self.sample_interval)
+        thread_profilers = []
+
+        def profile_thread(frame, event, arg):
+            # First event of a thread started during the stage: hand it over
+            # to a profiler of its own
+            thread_profiler = cProfile.Profile()
+            thread_profilers.append(thread_profiler)
+            thread_profiler.enable()
+
+        # Since Python 3.12, cProfile relies on sys.monitoring and already
+        # sees every thread (and only one profiler can be active at a time)
+        profile_threads = sys.version_info < (3, 12)
+
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+
+        start = time.perf_counter()
+        sampler.start()
+        if profile_threads:
+            threading.setprofile(profile_thread)
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+            if profile_threads:
+                threading.setprofile(None)
+            sampler.stop()
+            elapsed = time.perf_counter() - start
+
+            _, peak = tracemalloc.get_traced_memory()
+            allocations = tracemalloc.take_snapshot().statistics("lineno")[:self.top_n]
+            if not already_tracing:
+                tracemalloc.stop()
+
+            stats = pstats.Stats(profiler)
+            for thread_profiler in thread_profilers:
+                stats.add(thread_profiler)
+
+            self._save_stage(stage, stats, sampler.samples, elapsed, peak, allocations)
+
+    def _save_stage(self, stage, stats, samples, elapsed, peak, allocations):
+        """Write the pstats and collapsed-stack files of a stage and keep its summary."""
+        name = "".join(c if c.isalnum() or c in "-_" else "_" for c in stage)
+        index = len(self.results) + 1
+        base = self.run_dir / f"{index:02d}_{name}"
+
+        stats.dump_stats(f"{base}.pstats")
+        with open(f"{base}.collapsed", "w") as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        hot = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_n]
+
+        self.results.append({
+            "stage": stage,
+            "seconds": elapsed,
+            "peak_memory_mb": peak / 1e6,
+            "hot_functions": [
+                (f"{func} ({Path(file).name}:{line})", calls, tottime, cumtime)
+                for (file, line, func), (_, calls, tottime, cumtime, _) in hot
+            ],
+            "allocations": [
+                (str(stat.traceback[0]), stat.size / 1e6, stat.count) for stat in allocations
+            ],
+        })
+
+    def write_summary(self):
+        """
+        Write `summary.txt` with the timings, peak memory, hot functions and
+        allocation sites of every profiled stage, and print the stage timings.
+        """
+        if not self.enabled or not self.results:
+            return
+
+        lines = []
+        for result in self.results:
+            lines.append(f"=== {result['stage']}: {result['seconds']:.2f} s, "
+                         f"peak traced memory {result['peak_memory_mb']:.1f} MB ===")
+            lines.append(f"{'tottime':>10} {'cumtime':>10} {'calls':>10}  function")
+            for func, calls, tottime, cumtime in result["hot_functions"]:
+                lines.append(f"{tottime:10.3f} {cumtime:10.3f} {calls:10d}  {func}")
+            lines.append(f"{'MB':>10} {'blocks':>10}  allocation site (still allocated at the end of the stage)")
+            for site, size, count in result["allocations"]:
+                lines.append(f"{size:10.2f} {count:10d}  {site}")
+            lines.append("")
+
+        summary_path = self.run_dir / "summary.txt"
+        summary_path.write_text("\n".join(lines))
+
+        print("\n=== PROFILE ===")
+        for result in sorted(self.results, key=lambda r: r["seconds"], reverse=True):
+            print(f"⏱️ {result['stage']}: {result['seconds']:.2f} s, "
+                  f"{result['peak_memory_mb']:.1f} MB peak")
+        print(f"📁 Profiles written to {self.run_dir} (summary in {summary_path.name})")
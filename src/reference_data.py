@@ -0,0 +1,191 @@
+"""
+Reference Data Enrichment Module for AeroInvest
+
+Enriches the airports with the other OurAirports reference files: country and
+region names, runway statistics and radio frequencies.
+
+- The reference CSVs are kept in a local versioned cache
+  (`data/reference/`). Each file is re-downloaded only when the server
+  reports a change (conditional GET on its ETag / Last-Modified), and at
+  most once every `max_age_hours`.
+- Each file is loaded once per process into a dictionary-encoded lookup
+  index: the keys become a categorical dtype and the attributes are stored
+  in the order of its categories.
+- Airports are joined by converting their keys to categorical codes and
+  taking the attribute rows at those codes, so enrichment is a handful of
+  vectorized array operations.
+"""
+
+import json
+import time
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.http_client import http_client
+
+
+OURAIRPORTS_URL = "https://davidmegginson.github.io/ourairports-data"
+REFERENCE_FILES = ["countries.csv", "regions.csv", "runways.csv", "airport-frequencies.csv"]
+
+# Local cache of the reference files
+CACHE_DIR = Path(__file__).parent.parent / "data" / "reference"
+
+# Lookup indexes, built once per process by `load_reference_indexes`
+_indexes = None
+
+
+def _fetch_reference_file(filename, max_age_hours=24):
+    """
+    Return the content of a reference file from the local cache, refreshing
+    it first if it is older than `max_age_hours` and changed on the server.
+
+    The cache keeps, next to each file, a `.meta.json` with its ETag,
+    Last-Modified date, version number and last check time.
+    """
+    path = CACHE_DIR / filename
+    meta_path = CACHE_DIR / f"{filename}.meta.json"
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else {}
+
+    if path.exists() and time.time() - meta.get("checked_at", 0) < max_age_hours * 3600:
+        return path.read_bytes()
+
+    headers = {}
+    if path.exists():
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        res = http_client.get(f"{OURAIRPORTS_URL}/{filename}", headers=headers)
+        if res.status_code == 304:
+            print(f"\t{filename} unchanged (version {meta.get('version')}).")
+        else:
+            res.raise_for_status()
+            path.write_bytes(res.content)
+            meta.update(etag=res.headers.get("ETag"),
+                        last_modified=res.headers.get("Last-Modified"),
+                        version=meta.get("version", 0) + 1)
+            print(f"\t{filename} downloaded (version {meta['version']}).")
+        meta["checked_at"] = time.time()
+        meta_path.write_text(json.dumps(meta, indent=2))
+
+    except Exception as e:
+        if not path.exists():
+            raise
+        print(f"⚠️ Could not refresh {filename}, using the cached version: {e}")
+
+    return path.read_bytes()
+
+
+class _LookupIndex:
+    """
+    Dictionary-encoded lookup table: `keys` become the categories of a
+    categorical dtype and `values` holds one row of attributes per category.
+    """
+
+    def __init__(self, keys, values):
+        self.dtype = pd.CategoricalDtype(categories=pd.Index(keys))
+        self.columns = {}
+        for col in values.columns:
+            column = values[col].to_numpy()
+            if not np.issubdtype(column.dtype, np.floating):
+                column = column.astype(object)
+            # Trailing NaN slot, picked by the code -1 of unknown keys
+            self.columns[col] = np.append(column, np.nan)
+
+    def lookup(self, keys):
+        """Return the attribute rows matching `keys` (NaN for unknown keys), aligned with `keys`."""
+        codes = keys.astype(self.dtype).cat.codes.to_numpy()
+        return pd.DataFrame({col: column[codes] for col, column in self.columns.items()},
+                            index=keys.index)
+
+
+def load_reference_indexes(max_age_hours=24):
+    """
+    Load the OurAirports reference files into lookup indexes (once per process).
+
+    Returns:
+    -------
+    dict of _LookupIndex
+        "countries" and "regions" keyed on their ISO code, "runways" and
+        "frequencies" keyed on the airport id (aggregated per airport).
+    """
+    global _indexes
+    if _indexes is not None:
+        return _indexes
+
+    print("📚 Loading OurAirports reference data...")
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    raw = {name: _fetch_reference_file(name, max_age_hours) for name in REFERENCE_FILES}
+
+    # keep_default_na=False: "NA" is Namibia's country code
+    countries = pd.read_csv(BytesIO(raw["countries.csv"]), keep_default_na=False,
+                            usecols=["code", "name", "continent"])
+    regions = pd.read_csv(BytesIO(raw["regions.csv"]), keep_default_na=False,
+                          usecols=["code", "name"])
+    runways = pd.read_csv(BytesIO(raw["runways.csv"]),
+                          usecols=["airport_ref", "length_ft", "lighted", "closed"])
+    frequencies = pd.read_csv(BytesIO(raw["airport-frequencies.csv"]),
+                              usecols=["airport_ref", "type", "frequency_mhz"])
+
+    # Per-airport aggregates, computed once
+    open_runways = runways[runways["closed"] != 1]
+    runway_stats = open_runways.groupby("airport_ref").agg(
+        runway_count=("length_ft", "size"),
+        longest_runway_ft=("length_ft", "max"),
+        lighted_runways=("lighted", "sum"),
+    )
+    frequency_stats = frequencies.groupby("airport_ref").agg(
+        frequency_count=("frequency_mhz", "size"),
+    )
+    frequency_stats["tower_frequency_mhz"] = (
+        frequencies[frequencies["type"] == "TWR"].groupby("airport_ref")["frequency_mhz"].first()
+    )
+
+    _indexes = {
+        "countries": _LookupIndex(countries["code"],
+                                  countries[["name", "continent"]]
+                                  .rename(columns={"name": "country_name"})),
+        "regions": _LookupIndex(regions["code"],
+                                regions[["name"]].rename(columns={"name": "region_name"})),
+        "runways": _LookupIndex(runway_stats.index, runway_stats),
+        "frequencies": _LookupIndex(frequency_stats.index, frequency_stats),
+    }
+
+    print(f"✅ Reference data loaded ({len(countries)} countries, {len(regions)} regions, "
+          f"{len(runways)} runways, {len(frequencies)} frequencies).")
+    return _indexes
+
+
+def enrich_airports(df):
+    """🗺️ Add country/region names, runway and frequency data to the airports"""
+    if df.empty:
+        print("⚠️ Airport data not found.")
+        return df
+
+    try:
+        indexes = load_reference_indexes()
+    except Exception as e:
+        print(f"⚠️ Failed to load reference data, airports not enriched: {e}")
+        return df
+
+    print(f"🔍 Enriching {len(df)} airports with reference data...")
+
+    enriched = pd.concat([
+        df,
+        indexes["countries"].lookup(df["iso_country"]),
+        indexes["regions"].lookup(df["iso_region"]),
+        indexes["runways"].lookup(df["id"]),
+        indexes["frequencies"].lookup(df["id"]),
+    ], axis=1)
+
+    counts = ["runway_count", "lighted_runways", "frequency_count"]
+    enriched[counts] = enriched[counts].fillna(0).astype(int)
+    enriched["enriched_at"] = datetime.utcnow()
+
+    return enriched
@@ -0,0 +1,397 @@
+"""
+Streaming Quote Ingestion Module for AeroInvest
+
+Subscribes to a real-time trade feed (Finnhub's websocket by default) for the
+companies in `companies.json` and loads the ticks into PostgreSQL in
+micro-batches, complementing the snapshot taken by `run_stock_extraction`.
+
+- Ticks go into a bounded, preallocated ring buffer (`TickBuffer`). When the
+  database cannot keep up and the buffer is full, the oldest ticks are
+  dropped and counted, so memory never grows unbounded.
+- The buffer is flushed every `flush_interval_ms` milliseconds, or as soon as
+  it holds `flush_rows` ticks. Flushes run in a worker thread so the socket
+  keeps being read while a batch is committed. A batch that fails to load is
+  put back at the head of the buffer and retried with exponential backoff.
+- The connection is re-opened with exponential backoff and the symbols are
+  re-subscribed after any disconnect. Malformed messages and trades are
+  skipped and counted instead of stopping the stream.
+- `QuoteStream.metrics` reports the tick-arrival-to-commit latency.
+
+Set `FINNHUB_WS_URL` to point the stream at a local stand-in server
+(e.g. `ws://localhost:8765`) that speaks the same messages.
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import websockets
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+
+
+# Load environment variables
+load_dotenv()
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY")
+FINNHUB_WS_URL = os.getenv("FINNHUB_WS_URL", "wss://ws.finnhub.io")
+
+
+class TickBuffer:
+    """
+    Fixed-capacity ring buffer of trades stored in preallocated NumPy columns.
+
+    Parameters:
+    ----------
+    capacity : int
+        Maximum number of ticks held. When full, pushing a tick overwrites the oldest one.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.symbols = []
+        self._codes = {}
+
+        self._symbol = np.empty(capacity, dtype=np.int32)
+        self._price = np.empty(capacity, dtype=np.float64)
+        self._volume = np.empty(capacity, dtype=np.float64)
+        self._trade_ms = np.empty(capacity, dtype=np.int64)
+        self._received = np.empty(capacity, dtype=np.float64)
+
+        self._start = 0
+        self._size = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, symbol, price, volume, trade_ms, received):
+        """Append one tick, dropping the oldest one if the buffer is full."""
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes[symbol] = len(self.symbols)
+            self.symbols.append(symbol)
+
+        if self._size == self.capacity:
+            self._start = (self._start + 1) % self.capacity
+            self._size -= 1
+            self.dropped += 1
+
+        i = (self._start + self._size) % self.capacity
+        self._symbol[i] = code
+        self._price[i] = price
+        self._volume[i] = volume
+        self._trade_ms[i] = trade_ms
+        self._received[i] = received
+        self._size += 1
+
+    def requeue(self, batch):
+        """
+        Put a drained batch back in front of the buffered ticks, as if it had
+        never been drained. If they no longer fit, the oldest ticks are dropped.
+        """
+        current = self.drain()
+        total = len(batch["price"]) + len(current["price"])
+        overflow = max(0, total - self.capacity)
+        self.dropped += overflow
+
+        columns = {col: np.concatenate([batch[col], current[col]])[overflow:] for col in batch}
+        for symbol in pd.unique(columns["symbol"]):
+            if symbol not in self._codes:
+                self._codes[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+
+        n = len(columns["price"])
+        self._symbol[:n] = pd.Index(self.symbols).get_indexer(columns["symbol"])
+        self._price[:n] = columns["price"]
+        self._volume[:n] = columns["volume"]
+        self._trade_ms[:n] = columns["trade_ms"]
+        self._received[:n] = columns["received"]
+        self._start = 0
+        self._size = n
+
+    def drain(self):
+        """
+        Remove every buffered tick.
+
+        Returns:
+        -------
+        dict of numpy.ndarray
+            Copies of the tick columns in arrival order (`symbol`, `price`,
+            `volume`, `trade_ms` and `received`, the arrival time in epoch seconds).
+        """
+        idx = (self._start + np.arange(self._size)) % self.capacity
+        batch = {
+            "symbol": np.asarray(self.symbols, dtype=object)[self._symbol[idx]],
+            "price": self._price[idx],
+            "volume": self._volume[idx],
+            "trade_ms": self._trade_ms[idx],
+            "received": self._received[idx],
+        }
+        self._start = 0
+        self._size = 0
+        return batch
+
+
+def _parse_trade(trade):
+    """
+    Return the (symbol, price, volume, trade_ms) of a feed trade, or None if
+    the trade is malformed (not an object, missing or non-numeric fields).
+    """
+    try:
+        symbol, price, trade_ms = trade["s"], float(trade["p"]), int(trade["t"])
+        volume = trade.get("v")
+        volume = np.nan if volume is None else float(volume)
+    except (TypeError, KeyError, ValueError, AttributeError):
+        return None
+
+    if not isinstance(symbol, str) or not np.isfinite(price) or not 0 <= trade_ms < 2 ** 63:
+        return None
+    return symbol, price, volume, trade_ms
+
+
+class QuoteStream:
+    """
+    Websocket trade subscriber flushing micro-batches into PostgreSQL.
+
+    Parameters:
+    ----------
+    symbols : list of str
+        Tickers to subscribe to.
+    url : str, optional
+        Websocket URL. Defaults to `FINNHUB_WS_URL` with the Finnhub token.
+    table_name : str, optional
+        Target table, appended to (default is "stock_ticks").
+    flush_interval_ms : int, optional
+        Maximum time between two flushes, in milliseconds (default is 500).
+    flush_rows : int, optional
+        Number of buffered ticks that triggers an early flush (default is 1000).
+    buffer_size : int, optional
+        Capacity of the ring buffer (default is 100000).
+    engine : sqlalchemy.engine.Engine, optional
+        Engine to load with. Defaults to the project's PostgreSQL database.
+    """
+
+    def __init__(self, symbols, url=None, table_name="stock_ticks", flush_interval_ms=500,
+                 flush_rows=1000, buffer_size=100_000, engine=None):
+        self.symbols = list(symbols)
+        self.url = url or f"{FINNHUB_WS_URL}?token={FINNHUB_API_KEY}"
+        self.table_name = table_name
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_rows = flush_rows
+        self.buffer = TickBuffer(buffer_size)
+
+        if engine is None:
+            from src.load import get_connection_string
+            engine = create_engine(get_connection_string(), pool_pre_ping=True)
+        self.engine = engine
+
+        self._flush_needed = None
+        self._flush_failures = 0
+        self._retry_at = 0.0
+        self._latencies_ms = deque(maxlen=10_000)
+        self._counters = {"received": 0, "loaded": 0, "batches": 0, "failed_batches": 0,
+                          "invalid_messages": 0, "invalid_ticks": 0, "reconnects": 0}
+
+    # ------------------------------------------------------------------
+    # Feed
+    # ------------------------------------------------------------------
+    def _on_message(self, message):
+        """Buffer the trades of one feed message, skipping malformed ones."""
+        received = time.time()
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            msg = None
+        if not isinstance(msg, dict):
+            self._counters["invalid_messages"] += 1
+            print(f"\033[93mIgnoring malformed feed message: {message!r:.80}\033[0m")
+            return
+
+        if msg.get("type") == "trade":
+            trades = msg.get("data")
+            if not isinstance(trades, list):
+                self._counters["invalid_messages"] += 1
+                print(f"\033[93mIgnoring malformed feed message: {message!r:.80}\033[0m")
+                return
+
+            invalid = 0
+            for trade in trades:
+                parsed = _parse_trade(trade)
+                if parsed is None:
+                    invalid += 1
+                    continue
+                self.buffer.push(*parsed, received)
+                self._counters["received"] += 1
+
+            if invalid:
+                self._counters["invalid_ticks"] += invalid
+                print(f"\033[93mIgnoring {invalid} malformed trades: {message!r:.80}\033[0m")
+            if len(self.buffer) >= self.flush_rows:
+                self._flush_needed.set()
+        elif msg.get("type") == "error":
+            print(f"\033[91m[ERROR] Quote feed: {msg.get('msg')}\033[0m")
+
+    async def _consume(self, max_backoff=30.0):
+        """Read the feed forever, reconnecting with exponential backoff."""
+        attempt = 0
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20) as ws:
+                    for symbol in self.symbols:
+                        await ws.send(json.dumps({"type": "subscribe", "symbol": symbol}))
+                    print(f"\033[92mSubscribed to {len(self.symbols)} symbols.\033[0m")
+
+                    async for message in ws:
+                        # The feed is only healthy once it delivers something
+                        attempt = 0
+                        self._on_message(message)
+
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                print(f"\033[93mQuote feed disconnected: {e}\033[0m")
+
+            delay = random.uniform(0, min(max_backoff, 2 ** attempt))
+            attempt += 1
+            self._counters["reconnects"] += 1
+            print(f"Reconnecting in {delay:.1f} seconds...")
+            await asyncio.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+    def _write_batch(self, batch):
+        """Commit one micro-batch (blocking, runs in a worker thread)."""
+        df = pd.DataFrame({
+            "symbol": batch["symbol"],
+            "price": batch["price"],
+            "volume": batch["volume"],
+            "trade_time": pd.to_datetime(batch["trade_ms"], unit="ms"),
+            "received_at": pd.to_datetime(batch["received"], unit="s"),
+        })
+        with self.engine.begin() as conn:
+            df.to_sql(self.table_name, conn, if_exists="append", index=False, method="multi")
+        return time.time()
+
+    async def _flush(self, max_backoff=30.0):
+        if len(self.buffer) == 0:
+            return
+
+        batch = self.buffer.drain()
+        try:
+            committed = await asyncio.to_thread(self._write_batch, batch)
+        except Exception as e:
+            # Keep the ticks for the next flush; the ring buffer still bounds memory
+            self.buffer.requeue(batch)
+            self._counters["failed_batches"] += 1
+            delay = random.uniform(0.5, 1.0) * min(max_backoff, self.flush_interval * 2 ** self._flush_failures)
+            self._flush_failures += 1
+            self._retry_at = time.monotonic() + delay
+            print(f"\033[91m[ERROR] Failed to load {len(batch['price'])} ticks: {e}\033[0m")
+            print(f"Retrying in {delay:.1f} seconds ({len(self.buffer)} ticks buffered)...")
+            return
+
+        self._flush_failures = 0
+        self._latencies_ms.extend((committed - batch["received"]) * 1000)
+        self._counters["loaded"] += len(batch["price"])
+        self._counters["batches"] += 1
+
+    async def _flush_loop(self, report_every=10.0):
+        """Flush every `flush_interval` or when `flush_rows` ticks are waiting."""
+        last_report = time.monotonic()
+        while True:
+            # Back off after a failed load, whatever the buffer size
+            backoff = self._retry_at - time.monotonic()
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_needed.clear()
+            await self._flush()
+
+            if time.monotonic() - last_report >= report_every:
+                last_report = time.monotonic()
+                self.print_metrics()
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+    async def run(self, duration=None):
+        """
+        Stream until cancelled, or for `duration` seconds, then flush what is left.
+        """
+        self._flush_needed = asyncio.Event()
+        tasks = [asyncio.create_task(self._consume(), name="feed"),
+                 asyncio.create_task(self._flush_loop(), name="flush")]
+
+        try:
+            await asyncio.wait(tasks, timeout=duration, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for task, result in zip(tasks, results):
+                # Cancellation is not an Exception: only crashes are reported
+                if isinstance(result, Exception):
+                    print(f"\033[91m[ERROR] Quote stream {task.get_name()} task crashed: "
+                          f"{type(result).__name__}: {result}\033[0m")
+            await self._flush()
+            if len(self.buffer):
+                print(f"\033[91m[ERROR] {len(self.buffer)} ticks could not be loaded before stopping.\033[0m")
+            self.print_metrics()
+
+    def metrics(self):
+        """
+        Return the stream counters and the tick-arrival-to-commit latency
+        percentiles (in milliseconds, over the last 10000 loaded ticks).
+        """
+        metrics = dict(self._counters)
+        metrics["buffered"] = len(self.buffer)
+        metrics["dropped"] = self.buffer.dropped
+
+        latencies = np.fromiter(self._latencies_ms, dtype=np.float64)
+        if len(latencies):
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            metrics.update(latency_p50_ms=p50, latency_p95_ms=p95,
+                           latency_p99_ms=p99, latency_max_ms=latencies.max())
+        return metrics
+
+    def print_metrics(self):
+        m = self.metrics()
+        latency = (f"latency p50 {m['latency_p50_ms']:.0f} ms, p99 {m['latency_p99_ms']:.0f} ms"
+                   if "latency_p50_ms" in m else "no latency yet")
+        print(f"📈 {m['received']} ticks received, {m['loaded']} loaded in {m['batches']} batches, "
+              f"{m['dropped']} dropped, {m['invalid_ticks']} invalid, "
+              f"{m['reconnects']} reconnects, {latency}")
+
+
+def run_quote_stream(duration=None, **kwargs):
+    """
+    Stream real-time trades of the companies in `companies.json` into the
+    `stock_ticks` table until interrupted (Ctrl+C) or for `duration` seconds.
+
+    Extra keyword arguments are passed to `QuoteStream`.
+    """
+    from src.extract_stock_data import companies
+
+    # Private companies have no listed ticker
+    symbols = [symbol for symbol in companies.values() if not symbol.endswith(".PVT")]
+
+    # ANSI coded for blue
+    print(f"\n\n\033[94mStreaming quotes for {len(symbols)} symbols...\033[0m")
+    stream = QuoteStream(symbols, **kwargs)
+    try:
+        asyncio.run(stream.run(duration))
+    except KeyboardInterrupt:
+        print("\033[93mQuote stream stopped.\033[0m")
+    return stream.metrics()
+
+
+if __name__ == "__main__":
+    run_quote_stream()
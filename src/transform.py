@@ -73,45 +73,51 @@ def transform_transtats(df):
     df["Year"] = pd.to_numeric(df["Year"], errors="coerce")
     df["Month"] = pd.to_numeric(df["Month"], errors="coerce")
 
-    # Calculate total passengers per year
-    yearly = df.groupby("Year")[["TOTAL"]].sum().reset_index()
-    yearly["YoY_Change_%"] = yearly["TOTAL"].pct_change() * 100
+    # Calculate totals per year (for each dataset, airport and carrier queried)
+    keys = [col for col in ["Dataset", "Airport", "Carrier"] if col in df.columns]
+    yearly = df.groupby(keys + ["Year"])[["TOTAL"]].sum().reset_index()
+    if keys:
+        yearly["YoY_Change_%"] = yearly.groupby(keys)["TOTAL"].pct_change() * 100
+    else:
+        yearly["YoY_Change_%"] = yearly["TOTAL"].pct_change() * 100
 
     yearly["transformed_at"] = datetime.utcnow()
     
     return yearly
 
 
-def transform_flights(df):
-    """✈️ Clean Amadeus flight data"""
-    if df.empty:
+def transform_flights(segments, offer_segments):
+    """✈️ Clean Amadeus flight segments and their offer mapping"""
+    if segments.empty:
         print("⚠️ No flight data found.")
-        return pd.DataFrame()
+        return pd.DataFrame(), pd.DataFrame()
 
-    print(f"🔍 Transforming {len(df)} flight records...")
+    print(f"🔍 Transforming {len(segments)} flight segments "
+          f"({len(offer_segments)} offer-segment links)...")
 
-    # Convert datetimes
+    # Convert datetimes (already parsed by the extractor)
     for col in ["departure", "arrival"]:
-        df[col] = pd.to_datetime(df[col], errors="coerce")
+        if not pd.api.types.is_datetime64_any_dtype(segments[col]):
+            segments[col] = pd.to_datetime(segments[col], errors="coerce")
 
-    # Compute duration in hours
-    df["duration_hours"] = (df["arrival"] - df["departure"]).dt.total_seconds() / 3600
+    # Duration in hours, from the decoded ISO-8601 segment duration
+    # (departure and arrival are local times, so their difference is not reliable)
+    segments["duration_hours"] = segments["duration_minutes"] / 60
 
     # Price as float
-    df["price_EUR"] = pd.to_numeric(df["price_EUR"], errors="coerce")
-
-    # Average price per airline
-    price_summary = (
-        df.groupby("carrier_code")["price_EUR"]
-        .mean()
-        .reset_index()
-        .rename(columns={"price_EUR": "avg_price_EUR"})
-    )
+    if not pd.api.types.is_float_dtype(offer_segments["price_EUR"]):
+        offer_segments["price_EUR"] = pd.to_numeric(offer_segments["price_EUR"], errors="coerce")
 
-    df = df.merge(price_summary, on="carrier_code", how="left")
-    df["transformed_at"] = datetime.utcnow()
+    # Average price of the offers flown by each airline
+    carriers = offer_segments["segment_id"].map(segments.set_index("segment_id")["carrier_code"])
+    avg_price = offer_segments["price_EUR"].groupby(carriers).mean()
+    segments["avg_price_EUR"] = segments["carrier_code"].map(avg_price)
 
-    return df
+    transformed_at = datetime.utcnow()
+    segments["transformed_at"] = transformed_at
+    offer_segments["transformed_at"] = transformed_at
+
+    return segments, offer_segments
 
 
 if __name__ == "__main__":